@@ -1,235 +1,281 @@
-import streamlit as st
-import pandas as pd
-import json
-import os
-import tempfile
-from arxml_preprocessor import (
-    parse_service_interfaces,
-    parse_rbs_pdus,
-    generate_pdu_metadata,
-    log_debug,
-    infer_cycle_time_details,
-    extract_signal_compu_methods,
-    NS,
-    OUTPUT_JSON,
-    DEBUG_LOG
-)
-
-# Streamlit UI Configuration
-st.set_page_config(page_title="PDU Metadata Extractor", layout="wide")
-
-# Title and Introduction
-st.title("🚗 PDU Metadata Extractor")
-st.markdown("""
-Welcome to the PDU Metadata Extractor! This tool parses AUTOSAR ARXML files to extract Service Interface and PDU metadata, 
-combining them into a comprehensive JSON output. Upload your Service and RBS ARXML files below to get started.
-""")
-
-# File Upload Section
-st.header("📤 Upload ARXML Files")
-col1, col2 = st.columns(2)
-
-with col1:
-    service_file = st.file_uploader("Upload Service ARXML File", type=["arxml"], key="service")
-    if service_file:
-        st.success(f"Service file uploaded: {service_file.name}")
-
-with col2:
-    rbs_file = st.file_uploader("Upload RBS ARXML File", type=["arxml"], key="rbs")
-    if rbs_file:
-        st.success(f"RBS file uploaded: {rbs_file.name}")
-
-# Tabs for Viewing Data
-if service_file or rbs_file:
-    tabs = st.tabs(["Generate metadata JSON", "Service Interfaces", "PDU Data", "Debug Log", "Signal Computation Methods"])
-
-    # Save uploaded files to temporary paths
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".arxml") as tmp_service:
-        service_path = tmp_service.name
-        if service_file:
-            tmp_service.write(service_file.getvalue())
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".arxml") as tmp_rbs:
-        rbs_path = tmp_rbs.name
-        if rbs_file:
-            tmp_rbs.write(rbs_file.getvalue())
-
-    # Service Interfaces Tab
-    with tabs[1]:
-        if service_file:
-            st.subheader("Parsed Service Interfaces")
-            with st.spinner("Parsing service interfaces..."):
-                try:
-                    service_data = parse_service_interfaces(service_path)
-                    df = pd.DataFrame.from_dict(service_data, orient='index').reset_index()
-                    df.columns = ['Normalized Key', 'Service Interface', 'Service ID', 'Event IDs']
-                    st.dataframe(df, use_container_width=True)
-                    st.info(f"Found {len(service_data)} service interfaces.")
-                except Exception as e:
-                    st.error(f"Error parsing service interfaces: {str(e)}")
-                    log_debug(f"UI Error: Parsing service interfaces failed - {str(e)}")
-
-    # PDU Data Tab
-    with tabs[2]:
-        if rbs_file:
-            st.subheader("Parsed PDU Data")
-            with st.spinner("Parsing PDU data..."):
-                try:
-                    pdu_data = parse_rbs_pdus(rbs_path)
-                    for pdu_name, pdu_info in pdu_data.items():
-                        with st.expander(f"PDU: {pdu_name}"):
-                            st.write(f"**Length:** {pdu_info['length']} bits")
-                            st.write(f"**Cycle Time:** {pdu_info['cycle_time']} seconds")
-                            st.write(f"**Total Signals:** {pdu_info['total_signals']}")
-                            # Process signals to show computation method
-                            signal_data = []
-                            for sig_name, sig_info in pdu_info['signals'].items():
-                                signal_data.append({
-                                    "Signal Name": sig_name,
-                                    "Value": sig_info.get(f"{sig_name}_value", 0),
-                                    "Byte Order": sig_info.get(f"{sig_name}_Byte_order", "Unknown"),
-                                    "Start Bit": sig_info.get(f"{sig_name}_start_bit", -1),
-                                    "Length": sig_info.get(f"{sig_name}_len", "0"),
-                                    "Computation Method (LowerLimit.Name)": sig_info.get(f"{sig_name}_compu_method", "0.NoCompuMethod")
-                                })
-                            signals_df = pd.DataFrame(signal_data)
-                            st.dataframe(signals_df, use_container_width=True)
-                    st.info(f"Found {len(pdu_data)} PDUs.")
-
-                    # Cycle Time Computation Details
-                    st.subheader("Cycle Time Computation Details")
-                    st.markdown("""
-                    The cycle time for each PDU is computed by extracting a 2-4 digit number from the end of the PDU name 
-                    (e.g., '_100' in 'PDU_Name_100') and dividing it by 1000 to convert to seconds. If no number is found, 
-                    the cycle time is set to 0.0 seconds.
-                    """)
-                    cycle_time_data = []
-                    for pdu_name in pdu_data.keys():
-                        extracted_number, cycle_time = infer_cycle_time_details(pdu_name)
-                        cycle_time_data.append({
-                            "PDU Name": pdu_name,
-                            "Extracted Number": extracted_number,
-                            "Computed Cycle Time (s)": cycle_time
-                        })
-                    cycle_time_df = pd.DataFrame(cycle_time_data)
-                    st.dataframe(cycle_time_df, use_container_width=True)
-                except Exception as e:
-                    st.error(f"Error parsing PDU data: {str(e)}")
-                    log_debug(f"UI Error: Parsing PDU data failed - {str(e)}")
-
-    # Generated Metadata Tab
-    with tabs[0]:
-        st.subheader("Generated PDU Metadata")
-        if service_file and rbs_file:
-            # Input field for custom JSON filename
-            default_filename = OUTPUT_JSON
-            json_filename = st.text_input(
-                "Output JSON Filename",
-                value=default_filename,
-                help="Enter the filename for the generated JSON file (e.g., pdu_signal_metadata.json)"
-            )
-            if not json_filename.endswith(".json"):
-                json_filename += ".json"
-
-            if st.button("Generate Metadata JSON", key="generate"):
-                with st.spinner("Generating metadata..."):
-                    try:
-                        service_data = parse_service_interfaces(service_path)
-                        pdu_data = parse_rbs_pdus(rbs_path)
-                        final_metadata = generate_pdu_metadata(service_data, pdu_data)
-                        
-                        # Display metadata in expandable JSON viewer
-                        with st.expander("View Generated Metadata JSON", expanded=False):
-                            st.json(final_metadata)
-                        
-                        # Save to temporary file in text mode
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".json", mode='w') as tmp_json:
-                            json.dump(final_metadata, tmp_json, indent=2)
-                            tmp_json_path = tmp_json.name
-                        
-                        # Read file in binary mode for download
-                        with open(tmp_json_path, 'rb') as f:
-                            st.download_button(
-                                label="Download Metadata JSON",
-                                data=f,
-                                file_name=json_filename,
-                                mime="application/json",
-                                key="download_json"
-                            )
-                        
-                        # Display JSON content in text area below download button
-                        st.markdown("### JSON Content Preview")
-                        st.text_area(
-                            "Generated JSON Content",
-                            value=json.dumps(final_metadata, indent=2),
-                            height=300,
-                            disabled=True,
-                            key="json_preview"
-                        )
-                        
-                        st.success(f"Metadata generated successfully! Downloaded as {json_filename}")
-                        log_debug(f"UI: Metadata JSON generated and downloaded as {json_filename}")
-                    except Exception as e:
-                        st.error(f"Error generating metadata: {str(e)}")
-                        log_debug(f"UI Error: Metadata generation failed - {str(e)}")
-        else:
-            st.warning("Please upload both Service and RBS ARXML files to generate metadata.")
-
-    # Debug Log Tab
-    with tabs[3]:
-        st.subheader("Debug Log")
-        if os.path.exists(DEBUG_LOG):
-            with open(DEBUG_LOG, 'r') as f:
-                log_content = f.read()
-            st.text_area("Debug Log Content", log_content, height=300)
-        else:
-            st.info("No debug log available yet.")
-
-    # Signal Computation Methods Tab
-    with tabs[4]:
-        st.subheader("Signal Computation Methods")
-        if rbs_file:
-            with st.spinner("Parsing computation methods..."):
-                try:
-                    compu_methods, _ = extract_signal_compu_methods(rbs_path)
-                    if compu_methods:
-                        df = pd.DataFrame(compu_methods)
-                        df = df[['signal_name', 'raw_value', 'hex_value', 'description']]
-                        df.columns = ['Signal Name', 'Raw Value', 'Hex Value', 'Description']
-                        st.dataframe(df, use_container_width=True)
-                        st.info(f"Found {len(compu_methods)} computation method entries.")
-
-                        # Download as CSV
-                        csv_filename = st.text_input(
-                            "Output CSV Filename",
-                            value="signal_compu_methods.csv",
-                            help="Enter the filename for the generated CSV file (e.g., signal_compu_methods.csv)"
-                        )
-                        if not csv_filename.endswith(".csv"):
-                            csv_filename += ".csv"
-
-                        # Convert DataFrame to CSV
-                        csv_data = df.to_csv(index=False).encode('utf-8')
-                        st.download_button(
-                            label="Download Signal Computation Methods CSV",
-                            data=csv_data,
-                            file_name=csv_filename,
-                            mime="text/csv",
-                            key="download_csv"
-                        )
-                    else:
-                        st.warning("No computation methods found in the RBS file.")
-                except Exception as e:
-                    st.error(f"Error parsing computation methods: {str(e)}")
-                    log_debug(f"UI Error: Parsing computation methods failed - {str(e)}")
-        else:
-            st.warning("Please upload an RBS ARXML file to view computation methods.")
-
-    # Clean up temporary files
-    if os.path.exists(service_path):
-        os.unlink(service_path)
-    if os.path.exists(rbs_path):
-        os.unlink(rbs_path)
-
-else:
-    st.info("Upload ARXML files to begin parsing and generating metadata.")
+import streamlit as st
+import pandas as pd
+import hashlib
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from arxml_preprocessor import (
+    parse_service_interfaces_from_bytes,
+    parse_rbs_pdus_from_bytes,
+    generate_pdu_metadata,
+    log_debug,
+    extract_signal_compu_methods_from_bytes,
+    NS,
+    OUTPUT_JSON,
+    DEBUG_LOG
+)
+
+# Streamlit UI Configuration
+st.set_page_config(page_title="PDU Metadata Extractor", layout="wide")
+
+# Cached parser entry points keyed on file content, so Streamlit reruns
+# (every widget interaction) reuse the parsed result instead of re-parsing
+# the same ARXML bytes.
+@st.cache_data(show_spinner=False)
+def cached_parse_service_interfaces(data: bytes):
+    return parse_service_interfaces_from_bytes(data)
+
+@st.cache_data(show_spinner=False)
+def cached_parse_rbs_pdus(data: bytes):
+    return parse_rbs_pdus_from_bytes(data)
+
+_PARSERS = {
+    'service': cached_parse_service_interfaces,
+    'rbs': cached_parse_rbs_pdus,
+}
+
+def get_parsed(kind, uploaded_file):
+    # Session-state memoization on top of st.cache_data: the upload is hashed
+    # once per session, so the tabs and the Generate button share one parse
+    # per uploaded file instead of each re-parsing it.
+    data = uploaded_file.getvalue()
+    key = ('parsed', kind, uploaded_file.name, len(data),
+           hashlib.md5(data).hexdigest())
+    if key not in st.session_state:
+        st.session_state[key] = _PARSERS[kind](data)
+    return st.session_state[key]
+
+# Title and Introduction
+st.title("🚗 PDU Metadata Extractor")
+st.markdown("""
+Welcome to the PDU Metadata Extractor! This tool parses AUTOSAR ARXML files to extract Service Interface and PDU metadata, 
+combining them into a comprehensive JSON output. Upload your Service and RBS ARXML files below to get started.
+""")
+
+# File Upload Section
+st.header("📤 Upload ARXML Files")
+col1, col2 = st.columns(2)
+
+with col1:
+    service_file = st.file_uploader("Upload Service ARXML File", type=["arxml"], key="service")
+    if service_file:
+        st.success(f"Service file uploaded: {service_file.name}")
+
+with col2:
+    rbs_file = st.file_uploader("Upload RBS ARXML File", type=["arxml"], key="rbs")
+    if rbs_file:
+        st.success(f"RBS file uploaded: {rbs_file.name}")
+
+# Tabs for Viewing Data
+if service_file or rbs_file:
+    tabs = st.tabs(["Generate metadata JSON", "Service Interfaces", "PDU Data", "Debug Log", "Signal Computation Methods"])
+
+    # Service Interfaces Tab
+    with tabs[1]:
+        if service_file:
+            st.subheader("Parsed Service Interfaces")
+            with st.spinner("Parsing service interfaces..."):
+                try:
+                    service_data = get_parsed('service', service_file)
+                    df = pd.DataFrame.from_dict(service_data, orient='index').reset_index()
+                    df.columns = ['Normalized Key', 'Service Interface', 'Service ID', 'Event IDs']
+                    st.dataframe(df, use_container_width=True)
+                    st.info(f"Found {len(service_data)} service interfaces.")
+                except Exception as e:
+                    st.error(f"Error parsing service interfaces: {str(e)}")
+                    log_debug(f"UI Error: Parsing service interfaces failed - {str(e)}")
+
+    # PDU Data Tab
+    with tabs[2]:
+        if rbs_file:
+            st.subheader("Parsed PDU Data")
+            with st.spinner("Parsing PDU data..."):
+                try:
+                    pdu_data = get_parsed('rbs', rbs_file)
+
+                    # One flat table with PDU as a column instead of an
+                    # expander + dataframe widget per PDU: hundreds of
+                    # widgets re-rendered on every Streamlit rerun collapse
+                    # into a single frame update. The selectbox replaces the
+                    # expand-one-PDU affordance.
+                    selected_pdu = st.selectbox(
+                        "Filter by PDU",
+                        ["All PDUs"] + list(pdu_data.keys()),
+                        key="pdu_filter"
+                    )
+                    shown = pdu_data.keys() if selected_pdu == "All PDUs" else [selected_pdu]
+
+                    # Built as columns (dict of lists): DataFrame from a dict
+                    # of lists skips the per-row type inference that
+                    # list-of-dicts construction pays.
+                    pdus, pdu_lengths, cycle_times_col, total_signals = [], [], [], []
+                    sig_names, values, byte_orders = [], [], []
+                    start_bits, lengths, compu_methods = [], [], []
+                    for pdu_name in shown:
+                        pdu_info = pdu_data[pdu_name]
+                        # Keep signal-less PDUs visible as a single row
+                        signals = pdu_info['signals'] or {"": {}}
+                        for sig_name, sig_info in signals.items():
+                            pdus.append(pdu_name)
+                            pdu_lengths.append(pdu_info['length'])
+                            cycle_times_col.append(pdu_info['cycle_time'])
+                            total_signals.append(pdu_info['total_signals'])
+                            sig_names.append(sig_name)
+                            values.append(sig_info.get('value', 0))
+                            byte_orders.append(sig_info.get('byte_order', "Unknown"))
+                            start_bits.append(sig_info.get('start_bit', -1))
+                            lengths.append(sig_info.get('len', "0"))
+                            compu_methods.append(sig_info.get('compu_method', "0.NoCompuMethod"))
+                    pdu_df = pd.DataFrame({
+                        "PDU": pdus,
+                        "PDU Length": pdu_lengths,
+                        "Cycle Time (s)": cycle_times_col,
+                        "Total Signals": total_signals,
+                        "Signal Name": sig_names,
+                        "Value": values,
+                        "Byte Order": byte_orders,
+                        "Start Bit": start_bits,
+                        "Length": lengths,
+                        "Computation Method (LowerLimit.Name)": compu_methods
+                    })
+                    st.dataframe(pdu_df, use_container_width=True)
+                    st.info(f"Found {len(pdu_data)} PDUs.")
+
+                    # Cycle Time Computation Details
+                    st.subheader("Cycle Time Computation Details")
+                    st.markdown("""
+                    The cycle time for each PDU is computed by extracting a 2-4 digit number from the end of the PDU name 
+                    (e.g., '_100' in 'PDU_Name_100') and dividing it by 1000 to convert to seconds. If no number is found, 
+                    the cycle time is set to 0.0 seconds.
+                    """)
+                    # Vectorized: the regex extraction and the /1000 run in
+                    # pandas' C paths instead of a Python call per PDU
+                    names = pd.Series(list(pdu_data.keys()), name="PDU Name")
+                    extracted = names.str.extract(r'_(\d{2,4})$', expand=False)
+                    cycle_time_df = pd.DataFrame({
+                        "PDU Name": names,
+                        "Extracted Number": extracted.fillna("None"),
+                        "Computed Cycle Time (s)":
+                            (extracted.astype('float64') / 1000.0).fillna(0.0)
+                    })
+                    st.dataframe(cycle_time_df, use_container_width=True)
+                except Exception as e:
+                    st.error(f"Error parsing PDU data: {str(e)}")
+                    log_debug(f"UI Error: Parsing PDU data failed - {str(e)}")
+
+    # Generated Metadata Tab
+    with tabs[0]:
+        st.subheader("Generated PDU Metadata")
+        if service_file and rbs_file:
+            # Input field for custom JSON filename
+            default_filename = OUTPUT_JSON
+            json_filename = st.text_input(
+                "Output JSON Filename",
+                value=default_filename,
+                help="Enter the filename for the generated JSON file (e.g., pdu_signal_metadata.json)"
+            )
+            if not json_filename.endswith(".json"):
+                json_filename += ".json"
+
+            if st.button("Generate Metadata JSON", key="generate"):
+                with st.spinner("Generating metadata..."):
+                    try:
+                        service_data = get_parsed('service', service_file)
+                        pdu_data = get_parsed('rbs', rbs_file)
+                        final_metadata = generate_pdu_metadata(service_data, pdu_data)
+                        
+                        # Display metadata in expandable JSON viewer
+                        with st.expander("View Generated Metadata JSON", expanded=False):
+                            st.json(final_metadata)
+                        
+                        # Serialize once; the same payload feeds the download
+                        # button and the preview, no tempfile round-trip.
+                        # orjson encodes in C and emits bytes directly;
+                        # stdlib json is the fallback when it isn't installed.
+                        if orjson is not None:
+                            payload = orjson.dumps(final_metadata, option=orjson.OPT_INDENT_2)
+                        else:
+                            payload = json.dumps(final_metadata, indent=2).encode('utf-8')
+
+                        st.download_button(
+                            label="Download Metadata JSON",
+                            data=payload,
+                            file_name=json_filename,
+                            mime="application/json",
+                            key="download_json"
+                        )
+
+                        # Display JSON content in text area below download button
+                        st.markdown("### JSON Content Preview")
+                        st.text_area(
+                            "Generated JSON Content",
+                            value=payload.decode('utf-8'),
+                            height=300,
+                            disabled=True,
+                            key="json_preview"
+                        )
+                        
+                        st.success(f"Metadata generated successfully! Downloaded as {json_filename}")
+                        log_debug(f"UI: Metadata JSON generated and downloaded as {json_filename}")
+                    except Exception as e:
+                        st.error(f"Error generating metadata: {str(e)}")
+                        log_debug(f"UI Error: Metadata generation failed - {str(e)}")
+        else:
+            st.warning("Please upload both Service and RBS ARXML files to generate metadata.")
+
+    # Debug Log Tab
+    with tabs[3]:
+        st.subheader("Debug Log")
+        if os.path.exists(DEBUG_LOG):
+            with open(DEBUG_LOG, 'r') as f:
+                log_content = f.read()
+            st.text_area("Debug Log Content", log_content, height=300)
+        else:
+            st.info("No debug log available yet.")
+
+    # Signal Computation Methods Tab
+    with tabs[4]:
+        st.subheader("Signal Computation Methods")
+        if rbs_file:
+            with st.spinner("Parsing computation methods..."):
+                try:
+                    compu_methods, _ = extract_signal_compu_methods_from_bytes(rbs_file.getvalue())
+                    if compu_methods:
+                        df = pd.DataFrame(compu_methods)
+                        df = df[['signal_name', 'raw_value', 'hex_value', 'description']]
+                        df.columns = ['Signal Name', 'Raw Value', 'Hex Value', 'Description']
+                        st.dataframe(df, use_container_width=True)
+                        st.info(f"Found {len(compu_methods)} computation method entries.")
+
+                        # Download as CSV
+                        csv_filename = st.text_input(
+                            "Output CSV Filename",
+                            value="signal_compu_methods.csv",
+                            help="Enter the filename for the generated CSV file (e.g., signal_compu_methods.csv)"
+                        )
+                        if not csv_filename.endswith(".csv"):
+                            csv_filename += ".csv"
+
+                        # Convert DataFrame to CSV
+                        csv_data = df.to_csv(index=False).encode('utf-8')
+                        st.download_button(
+                            label="Download Signal Computation Methods CSV",
+                            data=csv_data,
+                            file_name=csv_filename,
+                            mime="text/csv",
+                            key="download_csv"
+                        )
+                    else:
+                        st.warning("No computation methods found in the RBS file.")
+                except Exception as e:
+                    st.error(f"Error parsing computation methods: {str(e)}")
+                    log_debug(f"UI Error: Parsing computation methods failed - {str(e)}")
+        else:
+            st.warning("Please upload an RBS ARXML file to view computation methods.")
+
+else:
+    st.info("Upload ARXML files to begin parsing and generating metadata.")
@@ -1,191 +1,370 @@
-import xml.etree.ElementTree as ET
-import re
-import os
-import json
-from collections import defaultdict
-import pandas as pd
-from difflib import get_close_matches
-
-NS = {'autosar': 'http://autosar.org/schema/r4.0'}
-
-SERVICE_FILE = "Service_Instance_A14_Ver_3.2 1.arxml"
-RBS_FILE = "RBS_A14_Ver_3.2 3.arxml"
-OUTPUT_JSON = "pdu_signal_metadata.json"
-DEBUG_LOG = "debug_log.txt"
-
-def log_debug(msg):
-    with open(DEBUG_LOG, 'a') as f:
-        f.write(msg + "\n")
-
-def normalize_name(name):
-    return name.replace("SomeIp", "").replace("_SI", "").replace("_", "").lower()
-
-def parse_service_interfaces(service_path):
-    service_map = {}
-    tree = ET.parse(service_path)
-    root = tree.getroot()
-    for si in root.findall('.//autosar:SOMEIP-SERVICE-INTERFACE-DEPLOYMENT', NS):
-        si_name = si.find('autosar:SHORT-NAME', NS).text
-        sid = si.find('.//autosar:SERVICE-INTERFACE-ID', NS)
-
-       
-        event_deployments = si.findall('.//autosar:EVENT-DEPLOYMENTS/autosar:SOMEIP-EVENT-DEPLOYMENT', NS)
-        event_ids = []
-        for ev in event_deployments:
-            eid = ev.find('autosar:EVENT-ID', NS)
-            if eid is not None:
-                event_ids.append(eid.text)
-
-        key = normalize_name(si_name)
-        service_map[key] = {
-            'service_interface': si_name,
-            'service_id': sid.text if sid is not None else '',
-            'event_ids': ','.join(event_ids)
-        }
-    return service_map
-
-def infer_cycle_time_from_name(pdu_name):
-    match = re.search(r'_([0-9]{2,4})$', pdu_name)
-    if match:
-        return str(float(match.group(1)) / 1000)
-    return "0.0"
-
-def parse_rbs_pdus(rbs_path):
-    tree = ET.parse(rbs_path)
-    root = tree.getroot()
-    pdu_map = {}
-
-    # Create a lookup for signal lengths
-    signal_length_map = {}
-    for signal in root.findall('.//autosar:I-SIGNAL', NS):
-        signal_name = signal.find('autosar:SHORT-NAME', NS).text
-        length_elem = signal.find('autosar:LENGTH', NS)
-        signal_length = length_elem.text if length_elem is not None else '0'
-        signal_length_map[signal_name] = signal_length
-
-    for pdu in root.findall('.//autosar:I-SIGNAL-I-PDU', NS):
-        pdu_name_elem = pdu.find('autosar:SHORT-NAME', NS)
-        pdu_name = pdu_name_elem.text if pdu_name_elem is not None else 'Unnamed_PDU'
-
-        length_elem = pdu.find('autosar:LENGTH', NS)
-        length = length_elem.text if length_elem is not None else '0'
-
-        timing = pdu.find('.//autosar:CYCLIC-TIMING', NS)
-        cycle_time = infer_cycle_time_from_name(pdu_name)
-        
-        signals = {}
-        signal_mappings = pdu.findall('.//autosar:I-SIGNAL-TO-PDU-MAPPINGS/autosar:I-SIGNAL-TO-I-PDU-MAPPING', NS)
-        signal_count = 0
-
-        for mapping in signal_mappings:
-            sig_ref = mapping.find('autosar:I-SIGNAL-REF', NS)
-            if sig_ref is not None:
-                sig_name = sig_ref.text.split('/')[-1]
-                start_pos = mapping.find('autosar:START-POSITION', NS)
-                byte_order = mapping.find('autosar:PACKING-BYTE-ORDER', NS)
-                # Fetch signal length from the signal_length_map
-                signal_len = signal_length_map.get(sig_name, '0')
-                signals[sig_name] = {
-                    f"{sig_name}_value": 0,
-                    f"{sig_name}_Byte_order": byte_order.text if byte_order is not None else 'Unknown',
-                    f"{sig_name}_start_bit": int(start_pos.text) if start_pos is not None else -1,
-                    f"{sig_name}_len": signal_len
-                }
-                signal_count += 1
-
-        pdu_map[pdu_name] = {
-            'length': length,
-            'cycle_time': cycle_time,
-            'signals': signals,
-            'total_signals': signal_count
-        }
-    return pdu_map
-
-def generate_pdu_metadata(service_data, pdu_data):
-    messages = {}
-    for pdu_name, pdu_info in pdu_data.items():
-        key = normalize_name(pdu_name)
-        matched_service = service_data.get(key, {'service_interface': 'N/A', 'service_id': '', 'event_ids': ''})
-        messages[pdu_name] = {
-            'pdu_name': pdu_name,
-            'service_interface': matched_service['service_interface'],
-            'service_id': matched_service['service_id'],
-            'event_ids': matched_service['event_ids'],
-            'length': pdu_info['length'],
-            'cycle_time': pdu_info['cycle_time'],
-            'total_signals': pdu_info['total_signals'],
-            'signals': pdu_info['signals']
-        }
-    return {"Messages": messages}
-
-def extract_signal_compu_methods(rbs_path):
-    tree = ET.parse(rbs_path)
-    root = tree.getroot()
-    compu_methods = []
-    
-  
-    for compu_method in root.findall('.//autosar:COMPU-METHOD', NS):
-        compu_name = compu_method.find('autosar:SHORT-NAME', NS).text
-      
-        for scale in compu_method.findall('.//autosar:COMPU-INTERNAL-TO-PHYS/autosar:COMPU-SCALES/autosar:COMPU-SCALE', NS):
-            lower_limit_elem = scale.find('autosar:LOWER-LIMIT', NS)
-            lower_limit = lower_limit_elem.text if lower_limit_elem is not None else '0'
-        
-            try:
-                hex_value = f"0x{int(lower_limit):X}" if lower_limit.isdigit() else '0x0'
-            except ValueError:
-                hex_value = '0x0'
-            vt_elem = scale.find('autosar:COMPU-CONST/autosar:VT', NS)
-            vt = vt_elem.text if vt_elem is not None else 'No Description'
-            compu_methods.append({
-                'signal_name': compu_name,
-                'raw_value': lower_limit,
-                'hex_value': hex_value,
-                'description': vt
-            })
-    
-   
-    signal_compu_map = {}
-    for signal in root.findall('.//autosar:I-SIGNAL', NS):
-        signal_name = signal.find('autosar:SHORT-NAME', NS).text
-        compu_method_ref = None
-    
-        phys_props = signal.find('.//autosar:PHYSICAL-PROPS', NS)
-        if phys_props is not None:
-            data_type_ref = phys_props.find('autosar:SW-DATA-DEF-PROPS/autosar:DATA-TYPE-REF', NS)
-            if data_type_ref is not None:
-                #
-                data_type_path = data_type_ref.text
-                data_type = root.find(f".//autosar:APPLICATION-DATA-TYPE[@DEST='APPLICATION-PRIMITIVE-DATA-TYPE' and .='{data_type_path}']", NS)
-                if data_type is not None:
-                    compu_method_ref = data_type.find('.//autosar:COMPU-METHOD-REF', NS)
-        if compu_method_ref is None:
-            
-            sw_data_def = signal.find('.//autosar:SW-DATA-DEF-PROPS', NS)
-            if sw_data_def is not None:
-                compu_method_ref = sw_data_def.find('autosar:COMPU-METHOD-REF', NS)
-        
-        if compu_method_ref is not None:
-            compu_name = compu_method_ref.text.split('/')[-1]
-           
-            for compu in compu_methods:
-                if compu['signal_name'] == compu_name:
-                    signal_compu_map[signal_name] = f"{compu['raw_value']}.{compu_name}"
-                    break
-            else:
-                signal_compu_map[signal_name] = "0.NoCompuMethod"
-        else:
-            signal_compu_map[signal_name] = "0.NoCompuMethod"
-    
-    return compu_methods, signal_compu_map
-
-
-def infer_cycle_time_details(pdu_name):
-    match = re.search(r'_([0-9]{2,4})$', pdu_name)
-    if match:
-        extracted_number = match.group(1)
-        cycle_time = str(float(extracted_number) / 1000)
-    else:
-        extracted_number = "None"
-        cycle_time = "0.0"
-    return extracted_number, cycle_time
+import atexit
+import functools
+import io
+import re
+import xml.sax
+import os
+import json
+import lxml.sax
+from collections import defaultdict
+import pandas as pd
+from lxml import etree
+
+NS = {'autosar': 'http://autosar.org/schema/r4.0'}
+# Fully-qualified tag prefix for lxml lookups (avoids the namespace-map dict
+# lookup that find(..., NS) does on every call)
+Q = '{http://autosar.org/schema/r4.0}'
+
+# Parser options shared by all parse paths: nothing here looks elements up
+# by XML ID, so skip lxml's ID-table maintenance; drop ignorable whitespace
+# text nodes; and keep lxml's default security limits explicit.
+_PARSER_OPTS = {
+    'collect_ids': False,
+    'remove_blank_text': True,
+    'huge_tree': False,
+}
+_PARSER = etree.XMLParser(**_PARSER_OPTS)
+
+def _iterparse(source, tag):
+    # Sources may be paths or in-memory buffers (e.g. Streamlit uploads);
+    # rewind buffers so parsers that scan the same source twice see the
+    # full document each time.
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return etree.iterparse(source, events=('end',), tag=tag, **_PARSER_OPTS)
+
+def _release_element(elem):
+    # Free the subtree and any already-processed siblings so iterparse keeps
+    # only the current element resident instead of the whole document
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+SERVICE_FILE = "Service_Instance_A14_Ver_3.2 1.arxml"
+RBS_FILE = "RBS_A14_Ver_3.2 3.arxml"
+OUTPUT_JSON = "pdu_signal_metadata.json"
+DEBUG_LOG = "debug_log.txt"
+
+# One long-lived handle instead of an open/write/close per log call;
+# line buffering keeps the file tailable while the app runs.
+_LOG_FH = open(DEBUG_LOG, 'a', buffering=1)
+atexit.register(_LOG_FH.close)
+
+def log_debug(msg):
+    _LOG_FH.write(msg + "\n")
+
+# All three substrings stripped in one scan instead of a replace pass
+# each; '_SI' precedes the bare '_' alternative so it wins at an
+# underscore, matching the old sequential-replace order
+_STRIP_RE = re.compile(r'SomeIp|_SI|_')
+
+@functools.lru_cache(maxsize=None)
+def normalize_name(name):
+    # Memoized: the same service/PDU names are normalized repeatedly
+    # across tabs and the metadata build
+    return _STRIP_RE.sub('', name).lower()
+
+def _is_parsed_tree(source):
+    return isinstance(source, (etree._Element, etree._ElementTree))
+
+def _extract_service_entry(si):
+    # Each deployment subtree is walked once with iter() generators
+    # instead of repeated .// rescans
+    si_name = si.find(Q + 'SHORT-NAME').text
+    sid = next(si.iter(Q + 'SERVICE-INTERFACE-ID'), None)
+    event_ids = [eid.text for eid in si.iter(Q + 'EVENT-ID')]
+    return normalize_name(si_name), {
+        'service_interface': si_name,
+        'service_id': sid.text if sid is not None else '',
+        'event_ids': ','.join(event_ids)
+    }
+
+def _extract_services(root):
+    # Callers holding an already-parsed tree skip the tokenization pass
+    # entirely - no tostring/reparse round-trip
+    return dict(_extract_service_entry(si)
+                for si in root.iter(Q + 'SOMEIP-SERVICE-INTERFACE-DEPLOYMENT'))
+
+def parse_service_interfaces(source):
+    # Accepts a path, raw bytes, or an already-parsed lxml Element/Tree
+    if _is_parsed_tree(source):
+        return _extract_services(source)
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    service_map = {}
+    for _, si in _iterparse(source, Q + 'SOMEIP-SERVICE-INTERFACE-DEPLOYMENT'):
+        key, entry = _extract_service_entry(si)
+        service_map[key] = entry
+        _release_element(si)
+    return service_map
+
+def parse_service_interfaces_from_bytes(data):
+    # In-memory entry point for callers holding the file content (e.g. a
+    # Streamlit upload) - no tempfile round-trip needed
+    return parse_service_interfaces(io.BytesIO(data))
+
+# Trailing 2-4 digit group in a PDU name, e.g. '_100' in 'PDU_Name_100'.
+# Compiled once: these functions run per PDU in the parsing loops.
+_CYCLE_RE = re.compile(r'_(\d{2,4})$')
+
+def infer_cycle_time_from_name(pdu_name):
+    match = _CYCLE_RE.search(pdu_name)
+    if match:
+        return str(float(match.group(1)) / 1000)
+    return "0.0"
+
+class _RbsPduHandler(xml.sax.handler.ContentHandler):
+    """SAX state machine for the RBS hot loop.
+
+    Builds the signal-length lookup and the PDU map in one pass with plain
+    tag-name comparisons - no per-element find() or tree construction at
+    all, so nothing but the current signal/PDU/mapping state is resident.
+    ARXML uses a default namespace without prefixes, so raw tag names are
+    the local names.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.signal_length_map = {}
+        self.pdu_map = {}
+        # Mappings seen before their I-SIGNAL; resolved after the parse
+        self.unresolved = []
+        self._stack = []
+        self._buf = None
+        self._signal = None
+        self._pdu = None
+        self._mapping = None
+
+    def startElement(self, name, attrs):
+        self._stack.append(name)
+        self._buf = []
+        if name == 'I-SIGNAL':
+            self._signal = {'name': None, 'length': '0'}
+        elif name == 'I-SIGNAL-I-PDU':
+            self._pdu = {'name': 'Unnamed_PDU', 'length': '0',
+                         'signals': {}, 'count': 0}
+        elif name == 'I-SIGNAL-TO-I-PDU-MAPPING' and self._pdu is not None:
+            self._mapping = {'ref': None, 'start_bit': -1, 'byte_order': 'Unknown'}
+
+    def characters(self, content):
+        if self._buf is not None:
+            self._buf.append(content)
+
+    def endElement(self, name):
+        self._stack.pop()
+        text = ''.join(self._buf) if self._buf else ''
+        self._buf = None
+
+        if name == 'SHORT-NAME':
+            parent = self._stack[-1] if self._stack else None
+            if parent == 'I-SIGNAL' and self._signal is not None:
+                self._signal['name'] = text
+            elif parent == 'I-SIGNAL-I-PDU' and self._pdu is not None:
+                self._pdu['name'] = text
+        elif name == 'LENGTH':
+            parent = self._stack[-1] if self._stack else None
+            if parent == 'I-SIGNAL' and self._signal is not None:
+                self._signal['length'] = text or '0'
+            elif parent == 'I-SIGNAL-I-PDU' and self._pdu is not None:
+                self._pdu['length'] = text or '0'
+        elif name == 'I-SIGNAL-REF':
+            if self._mapping is not None:
+                self._mapping['ref'] = text
+        elif name == 'START-POSITION':
+            if self._mapping is not None and text:
+                self._mapping['start_bit'] = int(text)
+        elif name == 'PACKING-BYTE-ORDER':
+            if self._mapping is not None:
+                self._mapping['byte_order'] = text
+        elif name == 'I-SIGNAL-TO-I-PDU-MAPPING':
+            self._end_mapping()
+        elif name == 'I-SIGNAL':
+            if self._signal is not None:
+                self.signal_length_map[self._signal['name']] = self._signal['length']
+                self._signal = None
+        elif name == 'I-SIGNAL-I-PDU':
+            if self._pdu is not None:
+                pdu = self._pdu
+                self.pdu_map[pdu['name']] = {
+                    'length': pdu['length'],
+                    'cycle_time': infer_cycle_time_from_name(pdu['name']),
+                    'signals': pdu['signals'],
+                    'total_signals': pdu['count']
+                }
+                self._pdu = None
+
+    # Namespace-aware callbacks so lxml.sax.saxify can drive the same
+    # state machine from an already-parsed tree; name is (uri, localname)
+    def startElementNS(self, name, qname, attrs):
+        self.startElement(name[1], attrs)
+
+    def endElementNS(self, name, qname):
+        self.endElement(name[1])
+
+    def _end_mapping(self):
+        mapping = self._mapping
+        self._mapping = None
+        if mapping is None or mapping['ref'] is None:
+            return
+        sig_name = mapping['ref'].rsplit('/', 1)[-1]
+        signal_len = self.signal_length_map.get(sig_name)
+        # Fixed field names: the signal name is already the key one level
+        # up, so prefixing it into every field just burns an f-string per
+        # access downstream
+        signal = {
+            'value': 0,
+            'byte_order': mapping['byte_order'],
+            'start_bit': mapping['start_bit'],
+            'len': signal_len if signal_len is not None else '0'
+        }
+        if signal_len is None:
+            self.unresolved.append((signal, sig_name))
+        self._pdu['signals'][sig_name] = signal
+        self._pdu['count'] += 1
+
+def parse_rbs_pdus(source):
+    # Accepts a path, raw bytes, or an already-parsed lxml Element/Tree.
+    # SAX drives the whole extraction either way: one pass over tokens or
+    # tree events, state machine dispatch on tag names only.
+    handler = _RbsPduHandler()
+    if _is_parsed_tree(source):
+        lxml.sax.saxify(source, handler)
+    else:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        elif hasattr(source, 'seek'):
+            source.seek(0)
+        xml.sax.parse(source, handler)
+
+    # Resolve mappings whose I-SIGNAL appeared later in the file
+    for signal, sig_name in handler.unresolved:
+        signal['len'] = handler.signal_length_map.get(sig_name, '0')
+    return handler.pdu_map
+
+def parse_rbs_pdus_from_bytes(data):
+    return parse_rbs_pdus(io.BytesIO(data))
+
+def generate_pdu_metadata(service_data, pdu_data):
+    messages = {}
+    for pdu_name, pdu_info in pdu_data.items():
+        key = normalize_name(pdu_name)
+        matched_service = service_data.get(key, {'service_interface': 'N/A', 'service_id': '', 'event_ids': ''})
+        messages[pdu_name] = {
+            'pdu_name': pdu_name,
+            'service_interface': matched_service['service_interface'],
+            'service_id': matched_service['service_id'],
+            'event_ids': matched_service['event_ids'],
+            'length': pdu_info['length'],
+            'cycle_time': pdu_info['cycle_time'],
+            'total_signals': pdu_info['total_signals'],
+            'signals': pdu_info['signals']
+        }
+    return {"Messages": messages}
+
+# XPath expressions for the compu-method extraction, compiled once at
+# import instead of re-parsed on every findall/find call. The text()
+# variants return the text content directly, skipping the .text access
+# and the None checks on miss.
+_COMPU_METHODS = etree.XPath('.//autosar:COMPU-METHOD', namespaces=NS)
+_COMPU_SCALES = etree.XPath(
+    './/autosar:COMPU-INTERNAL-TO-PHYS/autosar:COMPU-SCALES/autosar:COMPU-SCALE',
+    namespaces=NS)
+_SHORT_NAME_TEXT = etree.XPath('./autosar:SHORT-NAME/text()', namespaces=NS)
+_LOWER_LIMIT_TEXT = etree.XPath('./autosar:LOWER-LIMIT/text()', namespaces=NS)
+_COMPU_VT_TEXT = etree.XPath('./autosar:COMPU-CONST/autosar:VT/text()', namespaces=NS)
+_APP_DATA_TYPES = etree.XPath(
+    ".//autosar:APPLICATION-DATA-TYPE[@DEST='APPLICATION-PRIMITIVE-DATA-TYPE']",
+    namespaces=NS)
+_I_SIGNALS = etree.XPath('.//autosar:I-SIGNAL', namespaces=NS)
+_PHYS_DATA_TYPE_REF_TEXT = etree.XPath(
+    './/autosar:PHYSICAL-PROPS/autosar:SW-DATA-DEF-PROPS/autosar:DATA-TYPE-REF/text()',
+    namespaces=NS)
+_COMPU_METHOD_REF_TEXT = etree.XPath('.//autosar:COMPU-METHOD-REF/text()', namespaces=NS)
+_SW_COMPU_METHOD_REF_TEXT = etree.XPath(
+    './/autosar:SW-DATA-DEF-PROPS/autosar:COMPU-METHOD-REF/text()', namespaces=NS)
+
+def extract_signal_compu_methods(source):
+    # Accepts a path, raw bytes, or an already-parsed lxml Element/Tree
+    if _is_parsed_tree(source):
+        root = source.getroot() if isinstance(source, etree._ElementTree) else source
+    else:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        root = etree.parse(source, _PARSER).getroot()
+    compu_methods = []
+    # First scale per compu-method name, for O(1) resolution in the signal
+    # loop below (the list scan it replaces was O(signals x scales))
+    compu_by_name = {}
+
+    for compu_method in _COMPU_METHODS(root):
+        compu_name = _SHORT_NAME_TEXT(compu_method)[0]
+
+        for scale in _COMPU_SCALES(compu_method):
+            limits = _LOWER_LIMIT_TEXT(scale)
+            lower_limit = limits[0] if limits else '0'
+
+            try:
+                hex_value = f"0x{int(lower_limit):X}" if lower_limit.isdigit() else '0x0'
+            except ValueError:
+                hex_value = '0x0'
+            vts = _COMPU_VT_TEXT(scale)
+            vt = vts[0] if vts else 'No Description'
+            entry = {
+                'signal_name': compu_name,
+                'raw_value': lower_limit,
+                'hex_value': hex_value,
+                'description': vt
+            }
+            compu_methods.append(entry)
+            # setdefault preserves the first-match-wins behavior of the
+            # old linear scan
+            compu_by_name.setdefault(compu_name, entry)
+
+    # Index application data types by referenced path up front: one tree
+    # scan instead of a full-tree XPath per signal, and no interpolation of
+    # reference text into an XPath expression
+    app_types = {el.text: el for el in _APP_DATA_TYPES(root)}
+
+    signal_compu_map = {}
+    for signal in _I_SIGNALS(root):
+        signal_name = _SHORT_NAME_TEXT(signal)[0]
+        compu_method_ref = None
+
+        data_type_refs = _PHYS_DATA_TYPE_REF_TEXT(signal)
+        if data_type_refs:
+            data_type = app_types.get(data_type_refs[0])
+            if data_type is not None:
+                refs = _COMPU_METHOD_REF_TEXT(data_type)
+                if refs:
+                    compu_method_ref = refs[0]
+        if compu_method_ref is None:
+            refs = _SW_COMPU_METHOD_REF_TEXT(signal)
+            if refs:
+                compu_method_ref = refs[0]
+
+        if compu_method_ref is not None:
+            compu_name = compu_method_ref.split('/')[-1]
+            compu = compu_by_name.get(compu_name)
+            signal_compu_map[signal_name] = \
+                f"{compu['raw_value']}.{compu_name}" if compu is not None else "0.NoCompuMethod"
+        else:
+            signal_compu_map[signal_name] = "0.NoCompuMethod"
+
+    return compu_methods, signal_compu_map
+
+def extract_signal_compu_methods_from_bytes(data):
+    return extract_signal_compu_methods(io.BytesIO(data))
+
+
+def infer_cycle_time_details(pdu_name):
+    match = _CYCLE_RE.search(pdu_name)
+    if match:
+        extracted_number = match.group(1)
+        cycle_time = str(float(extracted_number) / 1000)
+    else:
+        extracted_number = "None"
+        cycle_time = "0.0"
+    return extracted_number, cycle_time